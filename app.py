@@ -1,43 +1,78 @@
 import os
 import logging
-from flask import Flask, render_template, request, jsonify
+import orjson
+from flask import Flask, Response, render_template, request, jsonify, make_response
+from werkzeug.http import generate_etag
 from werkzeug.middleware.proxy_fix import ProxyFix
+from flask_orjson import OrjsonProvider
 from gemini_translator import GeminiTranslator
 
-logging.basicConfig(level=logging.DEBUG)
+# DEBUG logs every sentence and timing on each request; set LOG_LEVEL=DEBUG
+# to see them while diagnosing
+logging.basicConfig(level=(os.environ.get("LOG_LEVEL") or "INFO").upper())
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
 # Initialize Gemini translator
 translator = GeminiTranslator()
 
+# The page only varies with the Firebase settings, which are fixed for the
+# process lifetime, so render it once and let browsers revalidate by ETag
+_index_page = None
+_index_etag = None
+
+# Sent every time a speaker clears their column
+_EMPTY_TRANSLATIONS = orjson.dumps({
+    'success': True,
+    'translations': {
+        'french': '',
+        'english': '',
+        'polish': ''
+    }
+})
+
+def _load_json():
+    """Decode the request body with orjson, skipping Flask's mimetype check"""
+    return orjson.loads(request.get_data(cache=False) or b'{}')
+
 @app.route('/')
 def index():
-    return render_template('index.html',
-                         firebase_api_key=os.environ.get("FIREBASE_API_KEY"),
-                         firebase_project_id=os.environ.get("FIREBASE_PROJECT_ID"),
-                         firebase_app_id=os.environ.get("FIREBASE_APP_ID"))
+    global _index_page, _index_etag
+    if _index_page is None:
+        page = render_template('index.html',
+                               firebase_api_key=os.environ.get("FIREBASE_API_KEY"),
+                               firebase_project_id=os.environ.get("FIREBASE_PROJECT_ID"),
+                               firebase_app_id=os.environ.get("FIREBASE_APP_ID"))
+        _index_etag = generate_etag(page.encode())
+        _index_page = page
+
+    response = make_response(_index_page)
+    response.set_etag(_index_etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
 
 @app.route('/translate', methods=['POST'])
 def translate():
     try:
-        data = request.get_json()
+        data = _load_json()
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid JSON payload.'
+        }), 400
+
+    try:
         text = data.get('text', '').strip()
         source_language = data.get('source_language', '')
         
         if not text:
-            return jsonify({
-                'success': True,
-                'translations': {
-                    'french': '',
-                    'english': '',
-                    'polish': ''
-                }
-            })
+            return Response(_EMPTY_TRANSLATIONS, mimetype='application/json')
         
-        logging.info(f"Processing translation: {len(text)} characters")
+        logging.debug("Processing translation: %d characters", len(text))
         translations = translator.translate_text(text, source_language)
         
         return jsonify({
@@ -46,11 +81,52 @@ def translate():
         })
         
     except Exception as e:
-        logging.error(f"Translation error: {str(e)}")
+        logging.error("Translation error: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Translation failed. Please try again.'
+        }), 500
+
+@app.route('/translate/stream', methods=['POST'])
+def translate_stream():
+    """Server-sent events, one per target language as soon as Gemini writes it"""
+    try:
+        data = _load_json()
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid JSON payload.'
+        }), 400
+
+    try:
+        text = data.get('text', '').strip()
+        source_language = data.get('source_language', '')
+    except Exception as e:
+        logging.error("Streaming translation error: %s", e)
         return jsonify({
             'success': False,
             'error': 'Translation failed. Please try again.'
         }), 500
 
+    # Errors can't change the status once streaming starts, so check up front
+    if not isinstance(source_language, str) or source_language not in translator.language_codes:
+        return jsonify({
+            'success': False,
+            'error': 'Unsupported source language.'
+        }), 400
+
+    def events():
+        try:
+            for language, translation in translator.translate_text_stream(text, source_language):
+                yield b'data: ' + orjson.dumps({'language': language, 'translation': translation}) + b'\n\n'
+        except Exception as e:
+            logging.error("Streaming translation error: %s", e)
+            yield b'event: error\ndata: ' + orjson.dumps({'error': 'Translation failed. Please try again.'}) + b'\n\n'
+        else:
+            yield b'event: done\ndata: {}\n\n'
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
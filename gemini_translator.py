@@ -1,22 +1,242 @@
 import os
 import logging
+import time
 import asyncio
-import concurrent.futures
-import json
+import hashlib
+import queue
+import re
+import sqlite3
+import threading
+import httpx
+import orjson
+from aiolimiter import AsyncLimiter
+from cachetools import LRUCache
 from google import genai
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# flash-lite is several times faster per token than flash and good enough
+# for short spoken sentences; override without a code change if needed
+_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash-lite")
+
+# Greedy decoding: no sampling cost, and the same sentence always gets the
+# same translation, which keeps the caches consistent
+_GENERATION_SETTINGS = {'temperature': 0.0, 'top_p': 1.0, 'candidate_count': 1}
+_PLAIN_CONFIG = types.GenerateContentConfig(**_GENERATION_SETTINGS)
+
+# Upper bound on concurrent Gemini calls across all requests
+_MAX_CONCURRENT_CALLS = 8
+
+# Client-side leaky bucket kept under the project's requests-per-minute
+# quota, so bursts queue briefly here instead of earning 429s and backoff
+_RATE_LIMITER = AsyncLimiter(int(os.environ.get("GEMINI_RPM", "900")), 60)
+
+# Keep the TLS connection to Gemini warm between bursts of speech. httpx
+# drops idle connections after 5s by default, which makes the first
+# sentence after every pause pay a fresh handshake.
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=_MAX_CONCURRENT_CALLS,
+                            keepalive_expiry=300)
+
+# Back off and retry when Gemini rate-limits (429) or is overloaded (503)
+# rather than dropping the sentence back to its source text
+_RETRY_OPTIONS = types.HttpRetryOptions(
+    attempts=4, initial_delay=0.5, max_delay=8, http_status_codes=[429, 503])
+
+# One client, and so one pair of connection pools, for the whole process
+_CLIENT = genai.Client(
+    api_key=os.environ.get("GEMINI_API_KEY", "default_key"),
+    http_options=types.HttpOptions(
+        timeout=60_000,
+        client_args={'limits': _HTTP_LIMITS},
+        async_client_args={'limits': _HTTP_LIMITS},
+        retry_options=_RETRY_OPTIONS))
+
+# One event loop for the process lifetime: every Gemini call of every
+# request is multiplexed on this thread instead of a thread per call.
+# uvloop's faster I/O polling when it is installed (not on Windows).
+try:
+    import uvloop
+    _LOOP = uvloop.new_event_loop()
+except ImportError:
+    _LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, name='gemini-loop', daemon=True).start()
+
+_BATCH_PROMPT = """You are a professional translator. Translate the following text from {src} into {t0} and {t1}.
+
+IMPORTANT: Put the {t0} translation in "{k0}" and the {t1} translation in "{k1}".
+
+Do not include any explanations, labels, or additional text.
+
+Text to translate: "{text}"
+
+Translations:"""
+
+_SENTENCES_PROMPT = """You are a professional translator. Translate each numbered line below from {src} into {t0} and {t1}.
+
+IMPORTANT: Return exactly one item per numbered line, in the same order. Put the {t0} translation in "{k0}" and the {t1} translation in "{k1}".
+
+Do not include any explanations, labels, or additional text.
+
+Lines to translate:
+{text}"""
+
+_STREAM_PROMPT = """You are a professional translator. Translate the following text from {src} into {t0} and {t1}.
+
+IMPORTANT: Provide ONLY the translations, each on a single line, in this exact order:
+{t0} translation
+{t1} translation
+
+Do not include any numbering, explanations, labels, or additional text.
+
+Text to translate: "{text}"
+
+Translations:"""
+
+_SINGLE_PROMPT = """You are a professional translator. Translate this text from {src} into {tgt}.
+
+IMPORTANT: You must translate the text into {tgt}. Do not keep it in {src}.
+
+Source language: {src}
+Target language: {tgt}
+Text to translate: "{text}"
+
+Translation in {tgt}:"""
+
+# Sentence translations on disk so a restarted container comes up warm;
+# set TRANSLATION_CACHE_DB to an empty string to keep everything in memory
+_STORE_PATH = os.environ.get("TRANSLATION_CACHE_DB", "translations.db")
+_STORE_TTL = int(os.environ.get("TRANSLATION_CACHE_TTL", str(30 * 24 * 3600)))
+_STORE_PRUNE_INTERVAL = 3600
+
+# Stand-in for {text} when pre-filling the language parts of a prompt
+_TEXT_SLOT = '\x00'
+
+
+class _TranslationStore:
+    """
+    SQLite table of sentence translations that outlives the process
+
+    Rows are keyed by a blake2b digest of (source, targets, sentence) and
+    expire after ttl seconds. Storage errors are logged and treated as a
+    miss, never as a failed translation.
+    """
+
+    def __init__(self, path: str, ttl: int):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS tcache '
+                           '(h BLOB PRIMARY KEY, payload BLOB NOT NULL, ts INTEGER NOT NULL)')
+        self.prune()
+
+    @staticmethod
+    def _digest(key: tuple) -> bytes:
+        source_language, target_languages, text = key
+        return hashlib.blake2b('|'.join((source_language, *target_languages, text)).encode(),
+                               digest_size=16).digest()
+
+    def get_many(self, keys) -> dict:
+        """
+        Stored translations for whichever of keys have one
+        """
+        found = {}
+        cutoff = int(time.time()) - self._ttl
+        try:
+            with self._lock:
+                for key in keys:
+                    row = self._conn.execute(
+                        'SELECT payload FROM tcache WHERE h = ? AND ts >= ?',
+                        (self._digest(key), cutoff)).fetchone()
+                    if row:
+                        found[key] = orjson.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning("Translation store read failed: %s", e)
+        return found
+
+    def put(self, items):
+        now = int(time.time())
+        rows = [(self._digest(key), orjson.dumps(translation), now) for key, translation in items]
+        try:
+            with self._lock:
+                self._conn.executemany('INSERT OR REPLACE INTO tcache VALUES (?, ?, ?)', rows)
+        except sqlite3.Error as e:
+            logger.warning("Translation store write failed: %s", e)
+
+    def prune(self):
+        try:
+            with self._lock:
+                self._conn.execute('DELETE FROM tcache WHERE ts < ?', (int(time.time()) - self._ttl,))
+        except sqlite3.Error as e:
+            logger.warning("Translation store prune failed: %s", e)
 
 
 class GeminiTranslator:
 
+    # Sentence-ending punctuation followed by whitespace
+    _SENT_RE = re.compile(r'(?<=[.!?])\s+')
+
+    # Runs of whitespace and a lone final period; "Welcome everyone." and
+    # "Welcome  everyone" translate the same, while case, commas and "!"
+    # can change the meaning or the tone of a toast and are kept
+    _NEAR_DUP_RE = re.compile(r'\s+|(?<!\.)\.\s*$')
+
+    # Text without a single letter or digit in it
+    _NO_WORDS_RE = re.compile(r'[\W_]*')
+
+    # Titles and shorthand in all three languages whose trailing dot does
+    # not end a sentence ("Dr. Smith", "M. Dupont", "np. wesele")
+    _ABBREVIATIONS = frozenset({
+        'mr.', 'mrs.', 'ms.', 'dr.', 'prof.', 'st.', 'etc.', 'e.g.', 'i.e.', 'vs.',
+        'mme.', 'mlle.', 'mm.', 'p.ex.', 'cf.',
+        'np.', 'itd.', 'itp.', 'tzn.', 'tj.', 'ul.', 'św.', 'pt.', 'godz.',
+    })
+
     def __init__(self):
         """Initialize Gemini client for translation"""
-        self.client = genai.Client(
-            api_key=os.environ.get("GEMINI_API_KEY", "default_key"))
+        self.client = _CLIENT
         self.language_codes = {
             'french': 'French',
             'english': 'English',
             'polish': 'Polish'
         }
+        # Target languages for each source, in language_codes order
+        self._targets = {
+            source: tuple(lang for lang in self.language_codes if lang != source)
+            for source in self.language_codes
+        }
+        self._batch_configs = {}
+        # Each prompt with everything but {text} filled in, as (prefix, suffix)
+        # keyed by (template, source); only the text changes between calls
+        self._prompt_parts = {
+            (template, source): self._fill_prompt(template, source)
+            for template in (_BATCH_PROMPT, _SENTENCES_PROMPT, _STREAM_PROMPT)
+            for source in self.language_codes
+        }
+        # Full-text translations keyed by (source_language, stripped text);
+        # toasts, names and "cheers" get re-sent constantly during an event.
+        # Bounded by total characters since a paragraph weighs more than "Hi".
+        self._cache = LRUCache(maxsize=4_000_000,
+                               getsizeof=lambda translations: sum(map(len, translations.values())))
+        self._cache_lock = threading.Lock()
+        # Per-sentence translations keyed by _sentence_key(),
+        # so a paragraph that grows by one sentence only sends the new one
+        self._sentence_cache = LRUCache(maxsize=4096)
+        # ...and behind it, the same translations persisted across restarts
+        self._store = None
+        if _STORE_PATH:
+            try:
+                self._store = _TranslationStore(_STORE_PATH, _STORE_TTL)
+            except sqlite3.Error as e:
+                logger.warning("Translation store unavailable, caching in memory only: %s", e)
+            else:
+                asyncio.run_coroutine_threadsafe(self._prune_store(), _LOOP)
+        # Translations currently awaiting Gemini, keyed like the cache;
+        # only touched from the event loop thread
+        self._inflight = {}
+        self._call_slots = asyncio.Semaphore(_MAX_CONCURRENT_CALLS)
 
     def translate_text(self, text: str, source_language: str) -> dict:
         """
@@ -29,161 +249,460 @@ class GeminiTranslator:
         Returns:
             Dict with translations for all three languages
         """
-        import time
-        start_time = time.time()
-        logging.info(f"🕐 TIMING: Server translation started for {source_language}")
-        logging.info(f"Processing translation: {len(text)} characters")
-        
+        if self._nothing_to_translate(text):
+            return dict.fromkeys(self.language_codes, text)
+        return asyncio.run_coroutine_threadsafe(
+            self._translate(text, source_language), _LOOP).result()
+
+    async def translate_text_async(self, text: str, source_language: str) -> dict:
+        """
+        Awaitable translate_text for callers running their own event loop
+        """
+        if self._nothing_to_translate(text):
+            return dict.fromkeys(self.language_codes, text)
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(
+            self._translate(text, source_language), _LOOP))
+
+    def translate_text_stream(self, text: str, source_language: str):
+        """
+        Yield (language, translation) pairs as soon as each target language is decoded
+
+        The first translation is usable while Gemini is still writing the
+        second, instead of waiting for the whole response. Text with line
+        breaks is translated sentence by sentence and yielded once done.
+        """
+        target_languages = self._targets[source_language]
+        if self._nothing_to_translate(text):
+            for lang in target_languages:
+                yield lang, text
+            return
+        with self._cache_lock:
+            cached = self._cache.get((source_language, text.strip()))
+        if cached is not None:
+            for lang in target_languages:
+                yield lang, cached[lang]
+            return
+
+        items = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in self._translate_batch_stream(
+                        text, source_language, target_languages):
+                    items.put(item)
+            except Exception as e:
+                items.put(e)
+            finally:
+                items.put(None)
+
+        asyncio.run_coroutine_threadsafe(pump(), _LOOP)
+        while (item := items.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def _nothing_to_translate(self, text: str) -> bool:
+        """
+        True for empty, whitespace-only or punctuation-only text, which is
+        returned as is rather than sent to Gemini
+        """
+        return self._NO_WORDS_RE.fullmatch(text) is not None
+
+    async def _translate(self, text: str, source_language: str) -> dict:
+        """
+        Serve from the cache, or join an identical translation already in flight
+        """
+        start_time = time.perf_counter()
+
+        # Surrounding whitespace never changes the translation, and typing
+        # adds and removes it constantly
+        key = (source_language, text.strip())
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            logger.debug("Translation cache hit")
+            translations = dict(cached)
+            translations[source_language] = text
+            return translations
+
+        # Several devices often send the same text at once; only the first
+        # caller goes to Gemini, the rest await its result
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._translate_uncached(text, source_language, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        translations = dict(await asyncio.shield(task))
+        translations[source_language] = text
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🕐 TIMING: %s translation of %d chars took %.0fms",
+                         source_language, len(text),
+                         (time.perf_counter() - start_time) * 1000)
+        return translations
+
+    async def _translate_uncached(self, text: str, source_language: str, key: tuple) -> dict:
+        """
+        Translate through Gemini and cache the result if every sentence succeeded
+        """
         translations = {'french': '', 'english': '', 'polish': ''}
         translations[source_language] = text
 
         # Always use sentence-based translation for accuracy
-        logging.info(f"Text is {len(text)} chars, using sentence-based translation")
-        sentence_translations = self._translate_sentence_by_sentence(text, source_language)
+        sentence_translations, complete = await self._translate_sentence_by_sentence(text, source_language)
         translations.update(sentence_translations)
-        
-        total_time = time.time() - start_time
-        logging.info(f"🕐 TIMING: Total server translation time: {total_time*1000:.0f}ms")
+        self._cache_translations(key, translations, complete)
         return translations
+
+    def _cache_translations(self, key: tuple, translations: dict, complete: bool) -> None:
+        """
+        Cache full-text translations, unless a failed sentence fell back to
+        its source text and would stay pinned untranslated
+        """
+        if not complete:
+            return
+        with self._cache_lock:
+            try:
+                self._cache[key] = dict(translations)
+            except ValueError:
+                # Larger than the whole cache; not worth keeping
+                pass
     
-    def _translate_sentence_by_sentence(self, text: str, source_language: str) -> dict:
+    async def _translate_sentence_by_sentence(self, text: str, source_language: str) -> tuple:
         """
         Translate text sentence by sentence for accuracy and speed
+
+        Returns:
+            Tuple of (translations by target language, True if every sentence translated)
         """
-        import time
-        import re
-        
-        start_time = time.time()
-        logging.info("🔄 Starting sentence-by-sentence translation")
+        start_time = time.perf_counter()
+        logger.debug("🔄 Starting sentence-by-sentence translation")
         
         # Split into sentences at punctuation boundaries
-        sentences = self._split_into_sentences(text)
-        logging.info(f"Split text into {len(sentences)} sentences")
+        sentences, joiner = self._split_into_sentences(text)
+        logger.debug("Split text into %d sentences", len(sentences))
         
         # Get target languages
-        target_languages = [
-            lang for lang in self.language_codes.keys()
-            if lang != source_language
-        ]
+        target_languages = self._targets[source_language]
         
-        # Initialize result storage
-        sentence_results = {lang: [] for lang in target_languages}
+        complete = True
         
-        # Translate each sentence individually
-        for i, sentence in enumerate(sentences):
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-                
-            logging.info(f"Translating sentence {i+1}/{len(sentences)}: '{sentence[:50]}...'")
-            
-            try:
-                sentence_translation = self._translate_batch(sentence, source_language, target_languages)
-                for lang in target_languages:
-                    sentence_results[lang].append(sentence_translation[lang])
-            except Exception as e:
-                logging.error(f"Sentence {i+1} translation failed: {e}")
+        # Translate each sentence individually, all of them in flight at once
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, sentence in enumerate(sentences):
+                logger.debug("Translating sentence %d/%d: '%.50s...'", i + 1, len(sentences), sentence)
+        results = await self._translate_sentences(sentences, source_language, target_languages)
+
+        for i, (sentence, sentence_translation) in enumerate(zip(sentences, results)):
+            if isinstance(sentence_translation, Exception):
+                logger.error("Sentence %d translation failed: %s", i + 1, sentence_translation)
+                complete = False
                 # Add original sentence to maintain flow
-                for lang in target_languages:
-                    sentence_results[lang].append(sentence)
+                results[i] = dict.fromkeys(target_languages, sentence)
         
         # Reassemble chunks maintaining original structure
-        final_translations = {}
-        for lang in target_languages:
-            # Join with line breaks if original text had line breaks
-            if '\n' in text:
-                final_translations[lang] = '\n\n'.join(sentence_results[lang])
-            else:
-                final_translations[lang] = ' '.join(sentence_results[lang])
+        final_translations = {
+            lang: joiner.join(result[lang] for result in results)
+            for lang in target_languages
+        }
         
-        end_time = time.time()
-        logging.info(f"🕐 TIMING: Sentence-by-sentence translation completed in {(end_time - start_time)*1000:.0f}ms")
+        end_time = time.perf_counter()
+        logger.debug("🕐 TIMING: Sentence-by-sentence translation completed in %.0fms",
+                     (end_time - start_time) * 1000)
         
-        return final_translations
+        return final_translations, complete
     
-    def _split_into_sentences(self, text: str) -> list:
+    def _split_into_sentences(self, text: str) -> tuple:
         """
         Split text into logical chunks - sentences OR line breaks
+
+        Returns:
+            Tuple of (chunks, joiner to reassemble their translations with)
         """
-        import re
-        
         # Split on both sentence punctuation AND line breaks
         # This handles real-world text with bullet points, line breaks, etc.
-        
-        # First split on line breaks (newlines)
-        lines = text.strip().split('\n')
-        
+        lines = text.splitlines()
+        # Keep paragraphs apart if the original text had line breaks
+        joiner = '\n\n' if len(lines) > 1 else ' '
+
         chunks = []
         for line in lines:
             line = line.strip()
             if not line:
                 continue
-                
-            # Further split each line on sentence punctuation if it's long
+
+            # Further split each line on sentence punctuation if it's long;
+            # the pattern eats the whitespace, so the pieces come out stripped
             if len(line) > 100:  # Only split long lines
-                sentence_pattern = r'(?<=[.!?])\s+'
-                sub_sentences = re.split(sentence_pattern, line)
-                for sub in sub_sentences:
-                    sub = sub.strip()
-                    if sub:
+                pending = ''
+                for sub in self._SENT_RE.split(line):
+                    if pending:
+                        sub = pending + ' ' + sub
+                    # Don't cut after a title, shorthand or initial
+                    if self._ends_with_abbreviation(sub):
+                        pending = sub
+                    else:
+                        pending = ''
                         chunks.append(sub)
+                if pending:
+                    chunks.append(pending)
             else:
                 chunks.append(line)
-        
-        logging.info(f"Split into {len(chunks)} chunks: {[s[:30] + '...' for s in chunks]}")
-        return chunks
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Split into %d chunks: %s", len(chunks), [s[:30] + '...' for s in chunks])
+        return chunks, joiner
     
-    def _translate_batch(self, text: str, source_language: str, target_languages: list) -> dict:
+    def _ends_with_abbreviation(self, sentence: str) -> bool:
         """
-        Single API call to translate to multiple languages simultaneously
+        True if the final dot belongs to an abbreviation or an initial like "J."
         """
-        source_lang_name = self.language_codes[source_language]
-        target_lang_names = [self.language_codes[lang] for lang in target_languages]
-        
-        prompt = f"""You are a professional translator. Translate the following text from {source_lang_name} into {target_lang_names[0]} and {target_lang_names[1]}.
+        last_word = sentence.rsplit(None, 1)[-1].lower()
+        return last_word in self._ABBREVIATIONS or (
+            len(last_word) == 2 and last_word[0].isalpha() and last_word[1] == '.')
 
-IMPORTANT: Provide ONLY the translations, one per line, in this exact order:
-1. {target_lang_names[0]} translation
-2. {target_lang_names[1]} translation
+    async def _translate_sentences(self, sentences: list, source_language: str, target_languages: tuple) -> list:
+        """
+        Translate sentences, sending all the uncached ones in a single Gemini call
 
-Do not include any explanations, labels, or additional text.
+        Returns:
+            One translation dict per sentence, or the exception that sentence failed with
+        """
+        results = [None] * len(sentences)
+        # Positions of each uncached sentence by cache key; toasts repeat
+        # "Cheers!" and names, and each distinct sentence only needs
+        # translating once
+        missing = {}
+        with self._cache_lock:
+            for i, sentence in enumerate(sentences):
+                if self._nothing_to_translate(sentence):
+                    # A stray "..." or "?!" reads the same in every language
+                    results[i] = dict.fromkeys(target_languages, sentence)
+                    continue
+                key = self._sentence_key(sentence, source_language, target_languages)
+                cached = self._sentence_cache.get(key)
+                if cached is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    results[i] = cached
+        if missing and self._store:
+            # Disk reads happen off the event loop so other requests' Gemini
+            # calls keep moving
+            stored = await asyncio.to_thread(self._store.get_many, list(missing))
+            with self._cache_lock:
+                self._sentence_cache.update(stored)
+            for key, translation in stored.items():
+                for i in missing.pop(key):
+                    results[i] = translation
 
-Text to translate: "{text}"
+        # One prompt for the whole paragraph pays the instructions and the
+        # round trip once; fall back to per-sentence calls if it misbehaves
+        if len(missing) > 1:
+            try:
+                batch = await self._translate_numbered_batch(
+                    [sentences[positions[0]] for positions in missing.values()],
+                    source_language, target_languages)
+            except Exception as e:
+                logger.error("Multi-sentence batch failed, translating sentences separately: %s", e)
+            else:
+                translated = dict(zip(missing, batch))
+                with self._cache_lock:
+                    self._sentence_cache.update(translated)
+                self._persist(list(translated.items()))
+                for positions, translation in zip(missing.values(), batch):
+                    for i in positions:
+                        results[i] = translation
+                missing = {}
 
-Translations:"""
+        if missing:
+            translated = await asyncio.gather(
+                *(self._translate_batch_and_cache(sentences[positions[0]], source_language,
+                                                  target_languages, key)
+                  for key, positions in missing.items()),
+                return_exceptions=True)
+            for positions, translation in zip(missing.values(), translated):
+                for i in positions:
+                    results[i] = translation
+        return results
+
+    async def _translate_batch_and_cache(self, text: str, source_language: str,
+                                         target_languages: tuple, key: tuple) -> dict:
+        """
+        _translate_batch for a sentence the caches already missed, keeping the result
+        """
+        result = await self._translate_batch(text, source_language, target_languages)
+        with self._cache_lock:
+            self._sentence_cache[key] = result
+        self._persist([(key, result)])
+        return result
+
+    def _persist(self, items: list) -> None:
+        """
+        Write sentence translations to the store in the background
+        """
+        if self._store:
+            _LOOP.run_in_executor(None, self._store.put, items)
+
+    def _sentence_key(self, sentence: str, source_language: str, target_languages: tuple) -> tuple:
+        """
+        Sentence cache key, shared by near-duplicates that differ only in
+        spacing or a final period
+        """
+        return (source_language, target_languages,
+                self._NEAR_DUP_RE.sub(' ', sentence).strip())
+
+    async def _prune_store(self):
+        """
+        Drop expired rows from the store for as long as the process runs
+        """
+        while True:
+            await asyncio.sleep(_STORE_PRUNE_INTERVAL)
+            await asyncio.to_thread(self._store.prune)
+
+    async def _translate_batch(self, text: str, source_language: str, target_languages: tuple) -> dict:
+        """
+        Single API call to translate to multiple languages simultaneously
+        """
+        prefix, suffix = self._prompt_parts[(_BATCH_PROMPT, source_language)]
+        prompt = prefix + text + suffix
 
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash-lite", contents=prompt)
+            async with _RATE_LIMITER, self._call_slots:
+                response = await self.client.aio.models.generate_content(
+                    model=_MODEL, contents=prompt,
+                    config=self._batch_config(target_languages))
+            self._check_not_truncated(response)
             
             if response.text:
-                lines = response.text.strip().split('\n')
-                # Clean up the lines
-                clean_lines = []
-                for line in lines:
-                    line = line.strip()
-                    # Remove numbering if present
-                    if line and (line[0].isdigit() or line.startswith('-')):
-                        line = line[1:].strip()
-                        if line.startswith('.') or line.startswith(')'):
-                            line = line[1:].strip()
-                    if line:
-                        clean_lines.append(line)
-                
-                if len(clean_lines) >= 2:
-                    result = {}
-                    result[target_languages[0]] = clean_lines[0]
-                    result[target_languages[1]] = clean_lines[1]
-                    return result
-                else:
-                    raise Exception("Insufficient translations in batch response")
+                data = orjson.loads(response.text)
+                return {lang: data[lang] for lang in target_languages}
             else:
                 raise Exception("Empty response from Gemini API")
                 
         except Exception as e:
-            logging.error(f"Batch translation error: {str(e)}")
+            logger.error("Batch translation error: %s", e)
             raise Exception(f"Batch translation failed: {str(e)}")
 
+    async def _translate_batch_stream(self, text: str, source_language: str, target_languages: tuple):
+        """
+        Streaming variant of _translate_batch yielding (language, translation) per completed line
+        """
+        sentences, joiner = self._split_into_sentences(text)
+        if joiner != ' ':
+            # Languages are told apart by line in the reply, so text with its
+            # own line breaks goes sentence by sentence and arrives in one go
+            translations = await self._translate(text, source_language)
+            for lang in target_languages:
+                yield lang, translations[lang]
+            return
+
+        prefix, suffix = self._prompt_parts[(_STREAM_PROMPT, source_language)]
+        prompt = prefix + ' '.join(sentences) + suffix
+
+        buffer = ''
+        pending = list(target_languages)
+        translations = {'french': '', 'english': '', 'polish': ''}
+        translations[source_language] = text
+        finish_reason = None
+        async with _RATE_LIMITER, self._call_slots:
+            async for chunk in await self.client.aio.models.generate_content_stream(
+                    model=_MODEL, contents=prompt, config=_PLAIN_CONFIG):
+                buffer += chunk.text or ''
+                finish_reason = chunk.candidates[0].finish_reason if chunk.candidates else None
+                while pending and '\n' in buffer:
+                    line, buffer = buffer.split('\n', 1)
+                    line = line.strip()
+                    if line:
+                        translations[pending[0]] = line
+                        yield pending.pop(0), line
+
+        # A reply cut off by the token limit or a safety stop ends in half a line
+        if finish_reason != types.FinishReason.STOP:
+            raise Exception(f"Stream stopped before finishing: {finish_reason}")
+
+        # The last translation usually arrives without a trailing newline
+        if pending and buffer.strip():
+            translations[pending[0]] = buffer.strip()
+            yield pending.pop(0), buffer.strip()
+            buffer = ''
+
+        if pending:
+            raise Exception(f"Stream ended without a translation for {', '.join(pending)}")
+        if buffer.strip():
+            raise Exception("Stream returned more lines than target languages")
+        self._cache_translations((source_language, text.strip()), translations, True)
+
+    async def _translate_numbered_batch(self, sentences: list, source_language: str, target_languages: tuple) -> list:
+        """
+        Single API call translating several sentences into both target languages
+        """
+        prefix, suffix = self._prompt_parts[(_SENTENCES_PROMPT, source_language)]
+        prompt = prefix + '\n'.join(f"{i}. {sentence}" for i, sentence in enumerate(sentences, 1)) + suffix
+
+        try:
+            async with _RATE_LIMITER, self._call_slots:
+                response = await self.client.aio.models.generate_content(
+                    model=_MODEL, contents=prompt,
+                    config=self._batch_config(target_languages, many=True))
+            self._check_not_truncated(response)
+
+            if response.text:
+                data = orjson.loads(response.text)
+                if len(data) != len(sentences):
+                    raise Exception(f"Expected {len(sentences)} translations, got {len(data)}")
+                return [{lang: item[lang] for lang in target_languages} for item in data]
+            else:
+                raise Exception("Empty response from Gemini API")
+
+        except Exception as e:
+            logger.error("Numbered batch translation error: %s", e)
+            raise Exception(f"Numbered batch translation failed: {str(e)}")
+
+    def _check_not_truncated(self, response) -> None:
+        """
+        Raise if Gemini stopped at its output token limit, which leaves the
+        JSON cut off mid-string
+        """
+        if response.candidates and response.candidates[0].finish_reason == types.FinishReason.MAX_TOKENS:
+            raise Exception("Translation truncated at the output token limit")
+
+    def _fill_prompt(self, template: str, source_language: str) -> tuple:
+        """
+        Split a prompt template, filled in for source_language, around its text
+        """
+        target_languages = self._targets[source_language]
+        prefix, suffix = template.format_map({
+            'src': self.language_codes[source_language],
+            't0': self.language_codes[target_languages[0]],
+            't1': self.language_codes[target_languages[1]],
+            'k0': target_languages[0],
+            'k1': target_languages[1],
+            'text': _TEXT_SLOT,
+        }).split(_TEXT_SLOT)
+        return prefix, suffix
+
+    def _batch_config(self, target_languages: tuple, many: bool = False) -> types.GenerateContentConfig:
+        """
+        Structured-output config asking Gemini for one string field per target
+        language, or a list of such objects when translating several sentences
+        """
+        key = (target_languages, many)
+        config = self._batch_configs.get(key)
+        if config is None:
+            schema = types.Schema(
+                type=types.Type.OBJECT,
+                properties={lang: types.Schema(type=types.Type.STRING) for lang in target_languages},
+                required=list(target_languages),
+                property_ordering=list(target_languages))
+            if many:
+                schema = types.Schema(type=types.Type.ARRAY, items=schema)
+            config = types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=schema,
+                **_GENERATION_SETTINGS)
+            self._batch_configs[key] = config
+        return config
+
     def _translate_to_language(self, text: str, source_lang: str,
                                target_lang: str) -> str:
         """
@@ -198,19 +717,15 @@ Translations:"""
             Translated text
         """
         # More explicit and stronger translation prompt
-        prompt = f"""You are a professional translator. Translate this text from {source_lang} into {target_lang}.
-
-IMPORTANT: You must translate the text into {target_lang}. Do not keep it in {source_lang}.
-
-Source language: {source_lang}
-Target language: {target_lang}
-Text to translate: "{text}"
-
-Translation in {target_lang}:"""
+        prompt = _SINGLE_PROMPT.format_map({
+            'src': source_lang,
+            'tgt': target_lang,
+            'text': text,
+        })
 
         try:
             response = self.client.models.generate_content(
-                model="gemini-2.5-flash-lite", contents=prompt)
+                model=_MODEL, contents=prompt, config=_PLAIN_CONFIG)
 
             if response.text:
                 translated = response.text.strip()
@@ -224,5 +739,5 @@ Translation in {target_lang}:"""
                 raise Exception("Empty response from Gemini API")
 
         except Exception as e:
-            logging.error(f"Gemini API error: {str(e)}")
+            logger.error("Gemini API error: %s", e)
             raise Exception(f"Translation service unavailable: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,9 @@
+# Gunicorn reads this file from the working directory, so both the
+# .replit workflow and the deployment command pick it up.
+
+# /translate spends nearly all of its time waiting on Gemini, so serve
+# requests on threads instead of the default single sync worker. One
+# process keeps a single translation cache and Gemini event loop.
+worker_class = "gthread"
+workers = 1
+threads = 16